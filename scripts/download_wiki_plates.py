@@ -17,17 +17,26 @@ Usage:
     python scripts/download_wiki_plates.py              # Full run
     python scripts/download_wiki_plates.py --dry-run    # Parse only, no downloads
     python scripts/download_wiki_plates.py --country DE  # Single country
+    python scripts/download_wiki_plates.py --force      # Re-download existing images
 """
 
 import argparse
-import json
+import hashlib
+import os
 import re
+import threading
 import time
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone
 from html import unescape
 from pathlib import Path
 
+import orjson
 import requests
+import requests_cache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # ---------------------------------------------------------------------------
 # Constants
@@ -35,8 +44,15 @@ import requests
 WIKIPEDIA_API_URL = "https://en.wikipedia.org/w/api.php"
 COMMONS_API_URL = "https://commons.wikimedia.org/w/api.php"
 USER_AGENT = "PlateSpotter/1.0 (https://github.com/platespotter; contact@platespotter.dev)"
-REQUEST_DELAY = 1.0
+MAX_CONCURRENT_REQUESTS = 8
+REQUEST_TIMEOUT = (5, 30)  # (connect, read) seconds
+API_BATCH_SIZE = 50  # MediaWiki limit on titles per query for normal clients
 ARTICLE_TITLE = "European_vehicle_registration_plate"
+MAXLAG = 5  # seconds of replication lag at which the API asks us to back off
+MAXLAG_RETRIES = 5
+HTTP_CACHE_TTL = 86400  # seconds to reuse cached API responses across runs
+DOWNLOAD_CHUNK_SIZE = 1 << 20  # bytes per read when streaming images to disk
+METADATA_CHECKPOINT_EVERY = 10  # entries between incremental metadata writes
 
 # Map the vehicle registration code used on the wiki page to ISO alpha-2
 # codes used in this project.  Codes that already match are omitted.
@@ -126,6 +142,30 @@ TERRITORY_NAMES = {
     "RSO": "South Ossetia", "PMR": "Transnistria",
 }
 
+# Wiki code -> (ISO code, friendly name), resolved once at import.  Codes
+# missing from WIKI_CODE_TO_ISO already match their ISO code (e.g. "AL").
+CODE_INFO: dict[str, tuple[str, str]] = {
+    **{iso: (iso, name) for iso, name in TERRITORY_NAMES.items()},
+    **{wc: (iso, TERRITORY_NAMES.get(iso, wc)) for wc, iso in WIKI_CODE_TO_ISO.items()},
+}
+
+# Wikitext patterns, compiled once at import
+_TAG_RE = re.compile(r"<[^>]+>")
+_ROW_SPLIT_RE = re.compile(r"\n\|-")
+_CODE_RE = re.compile(r"\[\[Vehicle registration plates of [^|]+\|([A-Z]+)\]\]")
+_FILE_RE = re.compile(r"\[\[(?:File|Image):([^|\]]+)")
+
+# Filename fragments that mark a Strip-column (euroband) image rather than
+# an Example-column plate, matched case-insensitively in a single scan.
+STRIP_PATTERNS = [
+    "euroband", "eurobamd",  # typo on wiki for Estonia
+    "-band.", "band.png", "band.svg",
+    "section-with", "section_with", "EU-section",
+    "Non-EU-section", "Identifier", "Number Plate Band",
+    "Blank Rear Identifier",
+]
+_STRIP_RE = re.compile("|".join(map(re.escape, STRIP_PATTERNS)), re.IGNORECASE)
+
 
 # ---------------------------------------------------------------------------
 # Utilities
@@ -133,7 +173,21 @@ TERRITORY_NAMES = {
 
 def strip_html(html_str: str) -> str:
     """Remove HTML tags and unescape entities."""
-    return unescape(re.sub(r"<[^>]+>", "", html_str)).strip()
+    return unescape(_TAG_RE.sub("", html_str)).strip()
+
+
+def write_json_atomic(path: Path, data: dict, pretty: bool = True) -> None:
+    """Write JSON to a temp file beside `path`, then rename it into place."""
+    option = orjson.OPT_INDENT_2 if pretty else 0
+    # A plain open() keeps the usual umask-derived mode on the final file
+    tmp = path.with_name(f".{path.name}.tmp")
+    try:
+        with open(tmp, "wb") as f:
+            f.write(orjson.dumps(data, option=option))
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
 
 
 def mime_to_ext(mime: str) -> str:
@@ -151,69 +205,215 @@ def mime_to_ext(mime: str) -> str:
 # API helpers
 # ---------------------------------------------------------------------------
 
-def _api_get(session: requests.Session, api_url: str, params: dict) -> dict:
-    """Rate-limited GET to a MediaWiki API endpoint."""
-    time.sleep(REQUEST_DELAY)
+def make_session(cache_path: Path) -> requests.Session:
+    """Create a cached session with pooled keep-alive connections and retries.
+
+    MediaWiki API responses are cached on disk in SQLite for HTTP_CACHE_TTL,
+    so reruns do not hit Wikipedia/Commons again; a stale copy is served if
+    the API errors.  Image downloads bypass the cache since the images
+    themselves are the output.  Connections to en.wikipedia.org,
+    commons.wikimedia.org and upload.wikimedia.org are kept warm across
+    entries, and rate-limit / transient server errors are retried with
+    jittered exponential backoff, honouring Retry-After.
+    """
+    # The API sends "Cache-Control: private, max-age=0" on every response,
+    # so the fixed expire_after is used instead of the server's headers.
+    session = requests_cache.CachedSession(
+        str(cache_path),
+        backend="sqlite",
+        expire_after=HTTP_CACHE_TTL,
+        urls_expire_after={"upload.wikimedia.org": requests_cache.DO_NOT_CACHE},
+        stale_if_error=True,
+        # Never cache API errors (e.g. maxlag), only real results
+        filter_fn=lambda resp: "MediaWiki-API-Error" not in resp.headers,
+    )
+    session.headers.update({"User-Agent": USER_AGENT})
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=2 * MAX_CONCURRENT_REQUESTS,
+        max_retries=Retry(
+            total=5,
+            backoff_factor=1.5,
+            backoff_jitter=1.0,
+            status_forcelist=[429, 500, 502, 503, 504],
+            respect_retry_after_header=True,
+            # Hand the final error response back so raise_for_status reports it
+            raise_on_status=False,
+        ),
+    )
+    session.mount("https://", adapter)
+    return session
+
+
+# Caps the number of in-flight requests to Wikimedia across all worker threads.
+_request_slots = threading.BoundedSemaphore(MAX_CONCURRENT_REQUESTS)
+
+
+def _api_get(session: requests.Session, api_url: str, params: dict,
+             refresh: bool = False) -> dict:
+    """Concurrency-limited GET to a MediaWiki API endpoint.
+
+    Sends maxlag so the servers can ask us to back off while they are
+    lagged, and waits out such requests before retrying.  With `refresh`,
+    the on-disk HTTP cache is bypassed and updated.
+    """
     params["format"] = "json"
-    resp = session.get(api_url, params=params)
-    if resp.status_code == 429:
-        wait = int(resp.headers.get("Retry-After", 60))
-        print(f"  Rate-limited -- waiting {wait}s")
+    params["maxlag"] = MAXLAG
+    kwargs = {"force_refresh": True} if refresh else {}
+    for _ in range(MAXLAG_RETRIES):
+        with _request_slots:
+            resp = session.get(api_url, params=params, timeout=REQUEST_TIMEOUT,
+                               **kwargs)
+        resp.raise_for_status()
+        data = resp.json()
+        if data.get("error", {}).get("code") != "maxlag":
+            return data
+        wait = int(resp.headers.get("Retry-After", MAXLAG))
+        print(f"  Server lagged -- waiting {wait}s")
         time.sleep(wait)
-        resp = session.get(api_url, params=params)
-    resp.raise_for_status()
-    return resp.json()
+    raise RuntimeError(f"{api_url} still lagged after {MAXLAG_RETRIES} attempts")
 
 
 def fetch_wikitext(session: requests.Session) -> str:
-    """Fetch the raw wikitext of the Wikipedia article."""
+    """Fetch the raw wikitext of the Wikipedia article.
+
+    Reads the latest revision directly rather than going through
+    action=parse, so the server does not have to invoke the parser.
+    """
     data = _api_get(session, WIKIPEDIA_API_URL, {
-        "action": "parse",
-        "page": ARTICLE_TITLE,
-        "prop": "wikitext",
+        "action": "query",
+        "prop": "revisions",
+        "titles": ARTICLE_TITLE,
+        "rvslots": "main",
+        "rvprop": "content",
+        "formatversion": "2",
     })
-    return data["parse"]["wikitext"]["*"]
+    return data["query"]["pages"][0]["revisions"][0]["slots"]["main"]["content"]
 
 
-def get_image_info(session: requests.Session, file_title: str) -> dict | None:
-    """Get download URL, license, dimensions, and attribution for a Commons file."""
-    data = _api_get(session, COMMONS_API_URL, {
-        "action": "query",
-        "titles": file_title,
-        "prop": "imageinfo",
-        "iiprop": "url|extmetadata|size|mime",
-        "iiextmetadatafilter": "LicenseShortName|Artist|ImageDescription|Credit|AttributionRequired|Restrictions",
-    })
-    pages = data.get("query", {}).get("pages", {})
-    for page_id, page_data in pages.items():
-        if page_id == "-1":
-            return None
-        info = page_data.get("imageinfo", [{}])[0]
-        ext = info.get("extmetadata", {})
-        return {
-            "url": info.get("url"),
-            "descriptionurl": info.get("descriptionurl"),
-            "width": info.get("width", 0),
-            "height": info.get("height", 0),
-            "mime": info.get("mime", ""),
-            "license": ext.get("LicenseShortName", {}).get("value", "Unknown"),
-            "artist": ext.get("Artist", {}).get("value", "Unknown"),
-            "description": ext.get("ImageDescription", {}).get("value", ""),
-            "credit": ext.get("Credit", {}).get("value", ""),
-            "attribution_required": ext.get("AttributionRequired", {}).get("value", ""),
-            "restrictions": ext.get("Restrictions", {}).get("value", ""),
+def _image_info_from_page(page_data: dict) -> dict:
+    """Flatten a Commons imageinfo page record into the fields we keep."""
+    info = page_data.get("imageinfo", [{}])[0]
+    ext = info.get("extmetadata", {})
+    return {
+        "url": info.get("url"),
+        "descriptionurl": info.get("descriptionurl"),
+        "width": info.get("width", 0),
+        "height": info.get("height", 0),
+        "mime": info.get("mime", ""),
+        "size": info.get("size", 0),
+        "sha1": info.get("sha1", ""),
+        "license": ext.get("LicenseShortName", {}).get("value", "Unknown"),
+        "artist": ext.get("Artist", {}).get("value", "Unknown"),
+        "description": ext.get("ImageDescription", {}).get("value", ""),
+        "credit": ext.get("Credit", {}).get("value", ""),
+        "attribution_required": ext.get("AttributionRequired", {}).get("value", ""),
+        "restrictions": ext.get("Restrictions", {}).get("value", ""),
+    }
+
+
+def iter_image_info_batches(session: requests.Session, file_titles: list[str],
+                            refresh: bool = False) -> Iterator[dict[str, dict | None]]:
+    """Get download URL, license, dimensions, and attribution for Commons files.
+
+    Titles are looked up API_BATCH_SIZE at a time.  Yields one dict per
+    batch, keyed by the requested title, as soon as that batch is resolved;
+    files that do not exist on Commons map to None.  Each distinct title is
+    yielded once.  With `refresh`, cached API responses are bypassed.
+    """
+    titles = list(dict.fromkeys(file_titles))
+    for i in range(0, len(titles), API_BATCH_SIZE):
+        batch = titles[i:i + API_BATCH_SIZE]
+        params = {
+            "action": "query",
+            "titles": "|".join(batch),
+            "prop": "imageinfo",
+            "iiprop": "url|extmetadata|size|mime|sha1",
+            "iiextmetadatafilter": "LicenseShortName|Artist|ImageDescription|Credit|AttributionRequired|Restrictions",
         }
-    return None
+
+        # The API reports pages under their normalised title (e.g. with
+        # underscores turned into spaces), so track what each request became.
+        normalized = {title: title for title in batch}
+        pages = {}
+        cont = {}
+        while True:
+            data = _api_get(session, COMMONS_API_URL, {**params, **cont},
+                            refresh=refresh)
+            query = data.get("query", {})
+            for norm in query.get("normalized", []):
+                normalized[norm["from"]] = norm["to"]
+            for page_data in query.get("pages", {}).values():
+                if "imageinfo" in page_data or page_data["title"] not in pages:
+                    pages[page_data["title"]] = page_data
+            if "continue" not in data:
+                break
+            cont = data["continue"]
+
+        results = {}
+        for title in batch:
+            page_data = pages.get(normalized[title])
+            if page_data is None or "missing" in page_data or "invalid" in page_data:
+                results[title] = None
+            else:
+                results[title] = _image_info_from_page(page_data)
+        yield results
+
+
+def _refresh_image_info(session: requests.Session, file_title: str) -> dict | None:
+    """Re-resolve one Commons file, bypassing the on-disk HTTP cache.
+
+    Returns None if the file cannot be resolved.
+    """
+    try:
+        batch = next(iter_image_info_batches(session, [file_title], refresh=True))
+    except (requests.RequestException, RuntimeError):
+        return None
+    return batch[file_title]
 
 
-def download_image(session: requests.Session, url: str, dest: str) -> None:
-    """Download a file from URL to local path."""
-    time.sleep(REQUEST_DELAY)
-    resp = session.get(url, stream=True)
-    resp.raise_for_status()
-    with open(dest, "wb") as f:
-        for chunk in resp.iter_content(8192):
-            f.write(chunk)
+class ChecksumError(OSError):
+    """A downloaded file's SHA-1 does not match the one Commons reported."""
+
+
+def download_image(session: requests.Session, url: str, dest: str,
+                   sha1: str | None = None) -> None:
+    """Download a file from URL to local path.
+
+    The body is written to a temporary file and only moved into place once
+    it is complete and, if given, its SHA-1 matches `sha1`.  Otherwise the
+    temporary file is discarded and the error is raised: a requests
+    exception for a failed or short read (urllib3 enforces Content-Length),
+    ChecksumError for a hash mismatch.
+    """
+    part = f"{dest}.part"
+    with _request_slots:
+        resp = session.get(url, stream=True, timeout=REQUEST_TIMEOUT)
+        resp.raise_for_status()
+        size = int(resp.headers.get("Content-Length", 0))
+        digest = hashlib.sha1()
+        try:
+            with open(part, "wb") as f:
+                if size and hasattr(os, "posix_fallocate"):
+                    try:
+                        os.posix_fallocate(f.fileno(), 0, size)
+                    except OSError:
+                        pass  # not supported by this filesystem; just a hint
+                # iter_content (rather than resp.raw) so that urllib3 read
+                # errors surface as requests exceptions
+                for chunk in resp.iter_content(DOWNLOAD_CHUNK_SIZE):
+                    f.write(chunk)
+                    digest.update(chunk)
+                # Drop any preallocated tail (Content-Length counts encoded bytes)
+                f.truncate()
+
+            if sha1 and digest.hexdigest() != sha1.lower():
+                raise ChecksumError(f"SHA-1 mismatch: expected {sha1}, got {digest.hexdigest()}")
+            os.replace(part, dest)
+        except BaseException:
+            if os.path.exists(part):
+                os.remove(part)
+            raise
 
 
 # ---------------------------------------------------------------------------
@@ -247,12 +447,7 @@ def parse_plate_tables(wikitext: str) -> list[dict]:
         if table_start == -1 or table_end == -1:
             continue
 
-        table_text = wikitext[table_start:table_end]
-
-        # Split into rows on "|-"
-        rows = re.split(r"\n\|-", table_text)
-
-        for row in rows[1:]:  # skip header row
+        for row in _iter_table_rows(wikitext, table_start, table_end):
             entry = _parse_table_row(row, section_name)
             if entry:
                 entries.append(entry)
@@ -260,6 +455,22 @@ def parse_plate_tables(wikitext: str) -> list[dict]:
     return entries
 
 
+def _iter_table_rows(wikitext: str, table_start: int,
+                     table_end: int) -> Iterator[str]:
+    """Yield the text of each body row of the table at [table_start, table_end).
+
+    Rows are delimited by "|-"; the header row before the first one is
+    skipped.  Only the current row is sliced out of the wikitext.
+    """
+    row_start = None
+    for match in _ROW_SPLIT_RE.finditer(wikitext, table_start, table_end):
+        if row_start is not None:
+            yield wikitext[row_start:match.start()]
+        row_start = match.end()
+    if row_start is not None:
+        yield wikitext[row_start:table_end]
+
+
 def _parse_table_row(row_text: str, section: str) -> dict | None:
     """Extract the wiki code and the first Example-column image from a table row."""
     # Split row into cells on "||"
@@ -268,20 +479,14 @@ def _parse_table_row(row_text: str, section: str) -> dict | None:
 
     # Extract the registration code from the Code column
     # Pattern: [[Vehicle registration plates of ...|CODE]]
-    code_match = re.search(
-        r'\[\[Vehicle registration plates of [^|]+\|([A-Z]+)\]\]',
-        row_text
-    )
+    code_match = _CODE_RE.search(row_text)
     if not code_match:
         return None
 
     wiki_code = code_match.group(1)
 
     # Find all [[File:...]] or [[Image:...]] references in the row
-    file_matches = re.findall(
-        r'\[\[(?:File|Image):([^|\]]+)',
-        row_text
-    )
+    file_matches = _FILE_RE.findall(row_text)
 
     if not file_matches:
         return None
@@ -293,32 +498,22 @@ def _parse_table_row(row_text: str, section: str) -> dict | None:
     # Strategy: skip images that look like eurobands/strips (contain "euroband",
     # "band", "section", "EU-section", "Non-EU-section", "Identifier") and
     # pick the first remaining image.
-    strip_patterns = [
-        "euroband", "eurobamd",  # typo on wiki for Estonia
-        "-band.", "band.png", "band.svg",
-        "section-with", "section_with", "EU-section",
-        "Non-EU-section", "Identifier", "Number Plate Band",
-        "Blank Rear Identifier",
-    ]
-
     example_image = None
     for filename in file_matches:
         filename_clean = filename.strip()
-        is_strip = any(p.lower() in filename_clean.lower() for p in strip_patterns)
-        if not is_strip:
+        if _STRIP_RE.search(filename_clean) is None:
             example_image = filename_clean
             break
 
     if not example_image:
         return None
 
-    # Normalise the filename (underscores for spaces is how Commons works)
-    iso = WIKI_CODE_TO_ISO.get(wiki_code, wiki_code)
+    iso, name = CODE_INFO.get(wiki_code, (wiki_code, wiki_code))
 
     return {
         "wiki_code": wiki_code,
         "iso": iso,
-        "name": TERRITORY_NAMES.get(iso, wiki_code),
+        "name": name,
         "image_file": f"File:{example_image}",
         "section": section,
     }
@@ -328,24 +523,63 @@ def _parse_table_row(row_text: str, section: str) -> dict | None:
 # Per-entry processing
 # ---------------------------------------------------------------------------
 
-def process_entry(entry: dict, output_dir: Path, session: requests.Session,
-                  dry_run: bool) -> dict:
-    """Resolve image info and download for one country/territory."""
+_print_lock = threading.Lock()
+
+
+def _is_local_copy_current(dest: Path, info: dict) -> bool:
+    """True if `dest` already holds the Commons file described by `info`."""
+    size = info.get("size")
+    if not size or not dest.exists() or dest.stat().st_size != size:
+        return False
+    if not info.get("sha1"):
+        return True
+    digest = hashlib.sha1()
+    with open(dest, "rb") as f:
+        while chunk := f.read(DOWNLOAD_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest() == info["sha1"].lower()
+
+
+def _local_image_path(output_dir: Path, iso: str, info: dict) -> Path:
+    """Where the image for `iso` described by `info` is stored."""
+    ext = mime_to_ext(info.get("mime", "image/jpeg"))
+    return output_dir / "plates" / "europe" / f"{iso}_wiki{ext}"
+
+
+def process_entry(entry: dict, info: dict | None, prior: dict | None,
+                  output_dir: Path, session: requests.Session,
+                  dry_run: bool, force: bool) -> dict:
+    """Download the resolved image for one country/territory.
+
+    Runs on a worker thread, so progress lines are buffered and printed
+    as one block once the entry is done.
+    """
+    lines = []
+    try:
+        return _process_entry(entry, info, prior, output_dir, session, dry_run,
+                              force, lines)
+    finally:
+        with _print_lock:
+            print("\n".join(lines))
+
+
+def _process_entry(entry: dict, info: dict | None, prior: dict | None,
+                   output_dir: Path, session: requests.Session, dry_run: bool,
+                   force: bool, lines: list[str]) -> dict:
     iso = entry["iso"]
     name = entry["name"]
     image_file = entry["image_file"]
 
-    print(f"\n[{iso}] {name}")
-    print(f"  Wiki image: {image_file}")
+    lines.append(f"\n[{iso}] {name}")
+    lines.append(f"  Wiki image: {image_file}")
 
-    info = get_image_info(session, image_file)
     if info is None:
-        print(f"  Could not resolve image info")
+        lines.append("  Could not resolve image info")
         return {"status": "failed", "reason": f"Image not found on Commons: {image_file}"}
 
     if dry_run:
-        print(f"  {info.get('width', '?')}x{info.get('height', '?')} "
-              f"[{info.get('mime', '?')}] license={info.get('license', '?')}")
+        lines.append(f"  {info.get('width', '?')}x{info.get('height', '?')} "
+                     f"[{info.get('mime', '?')}] license={info.get('license', '?')}")
         return {
             "status": "success_dry",
             "image_file": image_file,
@@ -355,16 +589,42 @@ def process_entry(entry: dict, output_dir: Path, session: requests.Session,
             "license": info.get("license", "Unknown"),
         }
 
-    ext = mime_to_ext(info.get("mime", "image/jpeg"))
-    filename = f"{iso}_wiki{ext}"
-    dest = output_dir / "plates" / "europe" / filename
-
-    print(f"  Downloading: {info.get('url', '')[:80]}...")
-    download_image(session, info["url"], str(dest))
-    print(f"  Saved: {filename}")
+    dest = _local_image_path(output_dir, iso, info)
+    filename = dest.name
+
+    # An identical copy is already on disk: skip the request entirely
+    if not force and _is_local_copy_current(dest, info):
+        lines.append(f"  Up to date: {filename}")
+        status = "success_cached"
+        same_url = prior is not None and prior.get("download_url") == info["url"]
+        downloaded_at = prior.get("downloaded_at") if same_url else None
+    else:
+        lines.append(f"  Downloading: {info.get('url', '')[:80]}...")
+        downloaded_at = datetime.now(timezone.utc).isoformat()
+        try:
+            try:
+                download_image(session, info["url"], str(dest),
+                               sha1=info.get("sha1"))
+            except ChecksumError:
+                # The cached imageinfo may predate a new upload of the file:
+                # re-resolve it past the HTTP cache and retry once if it changed
+                fresh = _refresh_image_info(session, image_file)
+                if fresh is None or fresh.get("sha1") == info.get("sha1"):
+                    raise
+                lines.append("  File changed on Commons -- retrying with fresh info")
+                info = fresh
+                dest = _local_image_path(output_dir, iso, info)
+                filename = dest.name
+                download_image(session, info["url"], str(dest),
+                               sha1=info.get("sha1"))
+        except (requests.RequestException, OSError) as exc:
+            lines.append(f"  Download failed: {exc}")
+            return {"status": "failed", "reason": f"Download failed: {exc}"}
+        lines.append(f"  Saved: {filename}")
+        status = "success"
 
     return {
-        "status": "success",
+        "status": status,
         "country_name": name,
         "iso": iso,
         "section": entry["section"],
@@ -382,7 +642,8 @@ def process_entry(entry: dict, output_dir: Path, session: requests.Session,
         "image_width": info.get("width", 0),
         "image_height": info.get("height", 0),
         "mime_type": info.get("mime", ""),
-        "downloaded_at": datetime.now(timezone.utc).isoformat(),
+        "sha1": info.get("sha1", ""),
+        "downloaded_at": downloaded_at,
     }
 
 
@@ -397,6 +658,11 @@ def main():
                         help="Parse and resolve without downloading")
     parser.add_argument("--country", type=str,
                         help="Process only one country (ISO code, e.g. DE)")
+    parser.add_argument("--force-refresh", action="store_true",
+                        help="Ignore cached API responses and re-query Wikipedia/Commons "
+                             "(e.g. after a plate image is re-uploaded)")
+    parser.add_argument("--force", action="store_true",
+                        help="Re-download images even if an identical local copy exists")
     parser.add_argument("--output-dir", type=str, default="dataset",
                         help="Output directory (default: dataset)")
     args = parser.parse_args()
@@ -405,28 +671,35 @@ def main():
     (output_dir / "plates" / "europe").mkdir(parents=True, exist_ok=True)
     (output_dir / "metadata").mkdir(parents=True, exist_ok=True)
 
-    session = requests.Session()
-    session.headers.update({"User-Agent": USER_AGENT})
+    session = make_session(output_dir / ".http_cache")
+    if args.force_refresh:
+        session.cache.clear()
 
     # 1. Fetch and parse the Wikipedia article
     print("Fetching Wikipedia article wikitext...")
     wikitext = fetch_wikitext(session)
-    entries = parse_plate_tables(wikitext)
-    print(f"Parsed {len(entries)} entries from wikitables")
+    all_entries = parse_plate_tables(wikitext)
+    print(f"Parsed {len(all_entries)} entries from wikitables")
 
     # 2. Filter if --country specified
+    entries = all_entries
     if args.country:
         code = args.country.upper()
-        entries = [e for e in entries if e["iso"] == code]
+        entries = [e for e in all_entries if e["iso"] == code]
         if not entries:
             print(f"Unknown country code: {code}")
             print("Available codes:")
-            all_entries = parse_plate_tables(wikitext)
             for e in all_entries:
                 print(f"  {e['iso']:5s}  {e['name']}")
             return
 
     # 3. Process each entry
+    metadata_path = output_dir / "metadata" / "wiki_plates.json"
+    try:
+        prior_entries = orjson.loads(metadata_path.read_bytes()).get("entries", {})
+    except (FileNotFoundError, orjson.JSONDecodeError):
+        prior_entries = {}
+
     metadata = {
         "generated_at": datetime.now(timezone.utc).isoformat(),
         "source": "Wikipedia - European vehicle registration plate",
@@ -434,24 +707,52 @@ def main():
         "entries": {},
     }
     log_results = {}
+    done = 0
 
+    entries_by_file = {}
     for entry in entries:
-        iso = entry["iso"]
-        result = process_entry(entry, output_dir, session, args.dry_run)
-
-        if result.get("status") in ("success", "success_dry"):
-            metadata["entries"][iso] = result
-            log_results[iso] = {
-                "status": result["status"],
-                "image_file": entry["image_file"],
-            }
-        else:
-            log_results[iso] = result
-
-        # Write metadata incrementally
-        if not args.dry_run:
-            with open(output_dir / "metadata" / "wiki_plates.json", "w") as f:
-                json.dump(metadata, f, indent=2, ensure_ascii=False)
+        entries_by_file.setdefault(entry["image_file"], []).append(entry)
+
+    # Resolve image info batch by batch, handing each batch's entries to the
+    # download pool straight away so downloads overlap the remaining lookups.
+    # Results are recorded as they complete, by the main thread only, which
+    # keeps it the sole writer of the metadata file.
+    print("Resolving image info on Commons...")
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as executor:
+        futures = {}
+        for infos in iter_image_info_batches(session, list(entries_by_file)):
+            for image_file, info in infos.items():
+                for entry in entries_by_file[image_file]:
+                    future = executor.submit(
+                        process_entry, entry, info,
+                        prior_entries.get(entry["iso"]), output_dir,
+                        session, args.dry_run, args.force)
+                    futures[future] = entry
+        for future in as_completed(futures):
+            entry = futures[future]
+            iso = entry["iso"]
+            result = future.result()
+
+            if result.get("status") in ("success", "success_cached", "success_dry"):
+                metadata["entries"][iso] = result
+                log_results[iso] = {
+                    "status": result["status"],
+                    "image_file": entry["image_file"],
+                }
+            else:
+                log_results[iso] = result
+
+            # Checkpoint metadata periodically so a crash loses little work
+            done += 1
+            if not args.dry_run and done % METADATA_CHECKPOINT_EVERY == 0:
+                write_json_atomic(metadata_path, metadata, pretty=False)
+
+    # Results arrive in completion order; store them in table order.
+    metadata["entries"] = {e["iso"]: metadata["entries"][e["iso"]]
+                           for e in entries if e["iso"] in metadata["entries"]}
+    log_results = {e["iso"]: log_results[e["iso"]] for e in entries}
+    if not args.dry_run:
+        write_json_atomic(metadata_path, metadata)
 
     # 4. Write final log
     log = {
@@ -465,8 +766,7 @@ def main():
                       if r.get("status") == "failed"),
         "results": log_results,
     }
-    with open(output_dir / "metadata" / "wiki_download_log.json", "w") as f:
-        json.dump(log, f, indent=2, ensure_ascii=False)
+    write_json_atomic(output_dir / "metadata" / "wiki_download_log.json", log)
 
     print(f"\nDone: {log['successful']}/{log['total_entries']} entries "
           f"({'dry run' if args.dry_run else 'downloaded'})")
@@ -0,0 +1,111 @@
+"""Download integrity tests for scripts/download_wiki_plates.py.
+
+Runs the downloader against a local HTTP server so short and corrupted
+bodies are exercised end to end.
+"""
+
+import hashlib
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+import requests
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+import download_wiki_plates as dwp  # noqa: E402
+
+BODY = b"x" * 1000
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "image/png")
+        self.send_header("Content-Length", str(len(BODY)))
+        self.end_headers()
+        if self.path == "/short":
+            # Advertise the full length, send a fraction, then hang up
+            self.wfile.write(BODY[:10])
+            self.wfile.flush()
+            self.close_connection = True
+        else:
+            self.wfile.write(BODY)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def server_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def _entry():
+    return {"iso": "DE", "name": "Germany", "image_file": "File:DE.png",
+            "section": "countries"}
+
+
+def _info(url, body=BODY):
+    return {"url": url, "mime": "image/png", "size": len(body),
+            "sha1": hashlib.sha1(body).hexdigest()}
+
+
+def test_short_body_raises_requests_error(server_url, tmp_path):
+    dest = tmp_path / "DE_wiki.png"
+    with pytest.raises(requests.RequestException):
+        dwp.download_image(requests.Session(), f"{server_url}/short", str(dest),
+                           sha1=hashlib.sha1(BODY).hexdigest())
+    assert not dest.exists()
+    assert not Path(f"{dest}.part").exists()
+
+
+def test_sha1_mismatch_raises_oserror(server_url, tmp_path):
+    dest = tmp_path / "DE_wiki.png"
+    with pytest.raises(OSError, match="SHA-1 mismatch"):
+        dwp.download_image(requests.Session(), f"{server_url}/full", str(dest),
+                           sha1=hashlib.sha1(b"other").hexdigest())
+    assert not dest.exists()
+
+
+def test_short_body_is_recorded_as_failed_entry(server_url, tmp_path):
+    (tmp_path / "plates" / "europe").mkdir(parents=True)
+    result = dwp.process_entry(_entry(), _info(f"{server_url}/short"), None,
+                               tmp_path, requests.Session(), False, False)
+    assert result["status"] == "failed"
+    assert not (tmp_path / "plates" / "europe" / "DE_wiki.png").exists()
+
+
+def test_complete_body_is_saved(server_url, tmp_path):
+    (tmp_path / "plates" / "europe").mkdir(parents=True)
+    result = dwp.process_entry(_entry(), _info(f"{server_url}/full"), None,
+                               tmp_path, requests.Session(), False, False)
+    assert result["status"] == "success"
+    assert (tmp_path / "plates" / "europe" / "DE_wiki.png").read_bytes() == BODY
+
+
+def test_stale_sha1_is_refreshed_past_cache(server_url, tmp_path, monkeypatch):
+    (tmp_path / "plates" / "europe").mkdir(parents=True)
+    url = f"{server_url}/full"
+    refreshes = []
+
+    def fake_api_get(session, api_url, params, refresh=False):
+        refreshes.append(refresh)
+        page = {"title": "File:DE.png", "imageinfo": [_info(url)]}
+        return {"query": {"pages": {"1": page}}}
+
+    monkeypatch.setattr(dwp, "_api_get", fake_api_get)
+    stale = _info(url, body=b"old upload")
+    stale["size"] = len(BODY)
+    result = dwp.process_entry(_entry(), stale, None, tmp_path,
+                               requests.Session(), False, False)
+    assert refreshes == [True]
+    assert result["status"] == "success"
+    assert result["sha1"] == hashlib.sha1(BODY).hexdigest()